@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+import plotly.express as px
 import numpy as np
 
+# Copy-on-Write: slicing/assignment berbagi buffer dan hanya menyalin saat ditulis
+pd.set_option("mode.copy_on_write", True)
+
 # Konfigurasi halaman Streamlit
 st.set_page_config(page_title="E-Commerce Analysis Dashboard", page_icon="📊", layout="wide")
 
@@ -16,89 +18,183 @@ st.markdown("This dashboard provides insights into e-commerce operations includi
 @st.cache_data
 def load_data():
     try:
-        orders = pd.read_csv('orders_dataset.csv', parse_dates=["order_purchase_timestamp", "order_delivered_customer_date", "order_estimated_delivery_date"])
-        payments = pd.read_csv('order_payments_dataset.csv')
-        reviews = pd.read_csv('order_reviews_dataset.csv')
+        # Konversi satu kali CSV -> Parquet (kolumnar, sudah bertipe) agar cache miss
+        # berikutnya tidak perlu parsing teks lagi
+        if not os.path.exists('orders.parquet'):
+            # Engine pyarrow: parsing CSV multi-threaded + kolom tanggal langsung
+            # bertipe datetime64; usecols agar kolom yang tak terpakai (status,
+            # alamat, dst.) tidak ikut diparse maupun ditulis ke Parquet
+            orders = pd.read_csv('orders_dataset.csv', engine="pyarrow",
+                                 usecols=["order_id", "order_purchase_timestamp", "order_delivered_customer_date", "order_estimated_delivery_date"],
+                                 parse_dates=["order_purchase_timestamp", "order_delivered_customer_date", "order_estimated_delivery_date"])
+            payments = pd.read_csv('order_payments_dataset.csv', engine="pyarrow",
+                                   usecols=["order_id", "payment_type", "payment_value"],
+                                   dtype={"payment_type": "category", "payment_value": "float32"})
+            reviews = pd.read_csv('order_reviews_dataset.csv', engine="pyarrow",
+                                  usecols=["order_id", "review_score"],
+                                  dtype={"review_score": "int8"})
+            orders.to_parquet('orders.parquet', engine="pyarrow", compression="snappy")
+            payments.to_parquet('payments.parquet', engine="pyarrow", compression="snappy")
+            reviews.to_parquet('reviews.parquet', engine="pyarrow", compression="snappy")
+
+        # Baca hanya kolom yang dipakai dashboard (column pruning)
+        orders = pd.read_parquet('orders.parquet', engine="pyarrow",
+                                 columns=["order_id", "order_purchase_timestamp", "order_delivered_customer_date", "order_estimated_delivery_date"])
+        payments = pd.read_parquet('payments.parquet', engine="pyarrow",
+                                   columns=["order_id", "payment_type", "payment_value"])
+        reviews = pd.read_parquet('reviews.parquet', engine="pyarrow",
+                                  columns=["order_id", "review_score"])
+
+        # Join key sebagai string Arrow (bukan object Python) supaya merge dan
+        # filter tidak perlu hashing string per-elemen di ruang objek
+        orders["order_id"] = orders["order_id"].astype("string[pyarrow]")
+        payments["order_id"] = payments["order_id"].astype("string[pyarrow]")
+        reviews["order_id"] = reviews["order_id"].astype("string[pyarrow]")
+
+        # Index reviews pada join key supaya penggabungan dengan orders menjadi
+        # lookup index, bukan hash-merge ulang setiap rerun
+        reviews = reviews.set_index("order_id")
+
+        # Bersihkan baris tanpa tanggal lengkap dan hitung kolom turunan sekali
+        # saja di sini; setiap rerun tinggal men-slice hasilnya
+        orders = orders.dropna(subset=["order_purchase_timestamp", "order_delivered_customer_date", "order_estimated_delivery_date"])
+        # Selisih hari dihitung langsung di ndarray datetime64 (cast C murni ke
+        # timedelta64[D], tanpa accessor .dt) dan disimpan sebagai int32
+        purchased = orders["order_purchase_timestamp"].to_numpy()
+        delivered = orders["order_delivered_customer_date"].to_numpy()
+        estimated = orders["order_estimated_delivery_date"].to_numpy()
+        orders["delivery_days"] = ((delivered - purchased) // np.timedelta64(1, "D")).astype("int32")
+        orders["is_late"] = delivered > estimated
+        # Clip ke 0: pesanan tepat waktu tidak perlu menyimpan selisih negatif
+        orders["days_late"] = np.maximum((delivered - estimated) // np.timedelta64(1, "D"), 0).astype("int32")
+
+        # Urutkan sekali berdasarkan timestamp pembelian supaya filter rentang
+        # tanggal bisa memakai binary search (slice), bukan boolean mask
+        orders = orders.sort_values("order_purchase_timestamp", kind="stable").reset_index(drop=True)
         return orders, payments, reviews
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None, None, None
 
+# **Cache komputasi turunan per-filter** — argumen DataFrame diberi prefix "_"
+# supaya Streamlit tidak meng-hash frame besar; kunci cache cukup parameter filter
+@st.cache_data
+def filter_by_payment(_payments, selected_payment):
+    if selected_payment == "All":
+        return _payments
+    return _payments[_payments["payment_type"] == selected_payment]
+
+@st.cache_data
+def compute_payment_counts(_filtered_payments, selected_payment):
+    # value_counts sudah terurut menurun; Series-nya langsung dipakai chart dan
+    # metrik tanpa reset_index + rename kolom. Kategori berjumlah nol dibuang
+    # agar chart tidak menampilkan bar kosong
+    payment_counts = _filtered_payments["payment_type"].value_counts()
+    return payment_counts[payment_counts > 0]
+
+@st.cache_data
+def compute_delivery_reviews(_filtered_orders, _reviews, start_date, end_date):
+    delivery_reviews = _filtered_orders.join(_reviews, on="order_id", how="inner")
+    # Potong outlier dengan np.percentile pada ndarray mentah (sekali lewat di C)
+    delivery_vals = delivery_reviews["delivery_days"].to_numpy()
+    if delivery_vals.size:
+        delivery_reviews = delivery_reviews[delivery_vals <= np.percentile(delivery_vals, 99, method="lower")]
+    return delivery_reviews
+
+@st.cache_data
+def compute_metrics(_filtered_orders, _reviews, start_date, end_date):
+    # Agregasi di ndarray mentah: mean jalan sebagai satu lintasan C yang
+    # SIMD-friendly, tanpa alokasi Series/index perantara. on_time_rate cukup
+    # satu pass di buffer boolean is_late yang sudah dihitung load_data
+    on_time_rate = (1.0 - float(np.mean(_filtered_orders["is_late"].to_numpy()))) * 100.0
+    avg_delivery_time = float(np.mean(_filtered_orders["delivery_days"].to_numpy()))
+    avg_review = float(np.mean(_reviews["review_score"].to_numpy()))
+    return on_time_rate, avg_delivery_time, avg_review
+
 # **2️⃣ Memuat Dataset**
 orders, payments, reviews = load_data()
 
-if orders is not None and payments is not None and reviews is not None:
-    # Pastikan tidak ada NaN pada kolom tanggal penting
-    orders.dropna(subset=["order_purchase_timestamp", "order_delivered_customer_date", "order_estimated_delivery_date"], inplace=True)
+# **3️⃣ Visualisasi Metode Pembayaran** — widget di dalam fragment hanya
+# me-rerun fragment ini, bukan seluruh script
+@st.fragment
+def payment_fragment(payments):
+    st.subheader("Payment Method Distribution")
 
-    # Sidebar filters
-    st.sidebar.header("Filters")
+    # Filter Metode Pembayaran
+    # Ambil opsi dari kamus categorical (O(jumlah kategori)), tanpa scan ulang kolom
+    payment_options = ["All"] + payments["payment_type"].cat.categories.tolist()
+    selected_payment = st.selectbox("Payment Method", payment_options)
+    filtered_payments = filter_by_payment(payments, selected_payment)
+
+    if filtered_payments.empty:
+        st.info("No payments found for the selected method.")
+        return
+
+    payment_counts = compute_payment_counts(filtered_payments, selected_payment)
+
+    # Render di sisi browser (vector), tanpa rasterisasi PNG di server
+    st.bar_chart(payment_counts)
+
+    # Ambil skalar sekali dengan .iat, bukan .iloc[0][...] berulang
+    top_method = payment_counts.index[0]
+    top_count = int(payment_counts.iat[0])
+    st.metric("Most Popular Payment Method", top_method, f"{top_count} transactions")
+
+# **4️⃣ Analisis Performa Pengiriman** — filter tanggal hanya me-rerun fragment ini
+@st.fragment
+def delivery_fragment(orders, reviews):
+    st.subheader("Delivery Performance Analysis")
 
     min_date, max_date = orders["order_purchase_timestamp"].min().date(), orders["order_purchase_timestamp"].max().date()
-    date_range = st.sidebar.date_input("Select Date Range", [min_date, max_date], min_value=min_date, max_value=max_date)
+    date_range = st.date_input("Select Date Range", [min_date, max_date], min_value=min_date, max_value=max_date)
 
     start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-    filtered_orders = orders[(orders["order_purchase_timestamp"] >= start_date) & (orders["order_purchase_timestamp"] <= end_date)]
-
-    # Filter Metode Pembayaran
-    payment_options = ["All"] + list(payments["payment_type"].unique())
-    selected_payment = st.sidebar.selectbox("Payment Method", payment_options)
-    filtered_payments = payments if selected_payment == "All" else payments[payments["payment_type"] == selected_payment]
-
-    # **3️⃣ Visualisasi Metode Pembayaran**
-    if not filtered_payments.empty:
-        st.subheader("Payment Method Distribution")
-        payment_counts = filtered_payments["payment_type"].value_counts().reset_index()
-        payment_counts.columns = ["payment_type", "count"]
-
-        fig1, ax1 = plt.subplots(figsize=(8, 4))
-        sns.barplot(x="payment_type", y="count", data=payment_counts, ax=ax1, palette="coolwarm")
-        ax1.set_xlabel("Payment Method")
-        ax1.set_ylabel("Transaction Count")
-        ax1.set_title("Distribution of Payment Methods")
-        plt.xticks(rotation=45)
-        st.pyplot(fig1)
-
-        st.metric("Most Popular Payment Method", payment_counts.iloc[0]["payment_type"], f"{payment_counts.iloc[0]['count']} transactions")
-
-    # **4️⃣ Analisis Performa Pengiriman**
-    if not filtered_orders.empty:
-        st.subheader("Delivery Performance Analysis")
-        filtered_orders["is_late"] = filtered_orders["order_delivered_customer_date"] > filtered_orders["order_estimated_delivery_date"]
-        filtered_orders["delivery_days"] = (filtered_orders["order_delivered_customer_date"] - filtered_orders["order_purchase_timestamp"]).dt.days
-
-        # **Visualisasi Review vs Delivery Time**
-        delivery_reviews = filtered_orders.merge(reviews, on="order_id", how="inner")
-        delivery_reviews = delivery_reviews[delivery_reviews["delivery_days"] <= delivery_reviews["delivery_days"].quantile(0.99)]
-
-        fig2, ax2 = plt.subplots(figsize=(8, 4))
-        sns.boxplot(x="review_score", y="delivery_days", data=delivery_reviews, ax=ax2, palette="viridis")
-        ax2.set_xlabel("Review Score (1-5)")
-        ax2.set_ylabel("Delivery Time (Days)")
-        ax2.set_title("Delivery Time vs Customer Reviews")
-        st.pyplot(fig2)
-
-        # **5️⃣ Key Metrics**
-        on_time_rate = (filtered_orders["order_delivered_customer_date"] <= filtered_orders["order_estimated_delivery_date"]).mean() * 100
-        avg_delivery_time = filtered_orders["delivery_days"].mean()
-        avg_review = reviews["review_score"].mean()
-
-        col1, col2, col3 = st.columns(3)
-        col1.metric("On-Time Delivery Rate", f"{on_time_rate:.1f}%")
-        col2.metric("Average Delivery Time", f"{avg_delivery_time:.1f} days")
-        col3.metric("Average Review Score", f"{avg_review:.1f}/5")
-
-        # **6️⃣ Late Orders Table**
-        st.subheader("Late Orders Analysis")
-        late_orders = filtered_orders[filtered_orders["is_late"]].copy()
-        late_orders["days_late"] = (late_orders["order_delivered_customer_date"] - late_orders["order_estimated_delivery_date"]).dt.days
-
-        if not late_orders.empty:
-            late_orders_summary = late_orders[["order_id", "days_late"]].sort_values(by="days_late", ascending=False).head(10)
-            st.dataframe(late_orders_summary, use_container_width=True)
-        else:
-            st.info("No late orders found in the selected date range.")
+    # Orders sudah terurut by timestamp -> cari batas slice via binary search (O(log n))
+    ts = orders["order_purchase_timestamp"].to_numpy()
+    lo = np.searchsorted(ts, np.datetime64(start_date))
+    hi = np.searchsorted(ts, np.datetime64(end_date) + np.timedelta64(1, "D"))
+    filtered_orders = orders.iloc[lo:hi]
+
+    if filtered_orders.empty:
+        st.info("No orders found in the selected date range.")
+        return
+
+    # **Visualisasi Review vs Delivery Time** (is_late/delivery_days sudah dihitung di load_data)
+    delivery_reviews = compute_delivery_reviews(filtered_orders, reviews, start_date, end_date)
+
+    fig2 = px.box(delivery_reviews, x="review_score", y="delivery_days",
+                  labels={"review_score": "Review Score (1-5)", "delivery_days": "Delivery Time (Days)"},
+                  title="Delivery Time vs Customer Reviews")
+    st.plotly_chart(fig2, use_container_width=True)
+
+    # **5️⃣ Key Metrics**
+    on_time_rate, avg_delivery_time, avg_review = compute_metrics(filtered_orders, reviews, start_date, end_date)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("On-Time Delivery Rate", f"{on_time_rate:.1f}%")
+    col2.metric("Average Delivery Time", f"{avg_delivery_time:.1f} days")
+    col3.metric("Average Review Score", f"{avg_review:.1f}/5")
+
+    # **6️⃣ Late Orders Table**
+    st.subheader("Late Orders Analysis")
+    # query() mengevaluasi predikat lewat numexpr (vectorized, multi-threaded)
+    # tanpa Series boolean perantara di level Python
+    late_orders = filtered_orders.query("is_late")
+
+    if not late_orders.empty:
+        # Top-10 lewat partial sort O(n) (argpartition), bukan full sort seluruh baris
+        days_late_vals = late_orders["days_late"].to_numpy()
+        k = min(10, len(days_late_vals))
+        top_idx = np.argpartition(-days_late_vals, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-days_late_vals[top_idx])]
+        late_orders_summary = late_orders.iloc[top_idx][["order_id", "days_late"]]
+        st.dataframe(late_orders_summary, use_container_width=True)
+    else:
+        st.info("No late orders found in the selected date range.")
 
+if orders is not None and payments is not None and reviews is not None:
+    payment_fragment(payments)
+    delivery_fragment(orders, reviews)
 else:
     st.error("Failed to load data. Please check your file paths and try again.")
 